@@ -0,0 +1,89 @@
+"""
+Chord quality classification from pitch-class bitmasks.
+
+Pure int/str code kept in its own module so it can optionally be compiled
+with mypyc (``mypyc chord_classify.py``); dataset_browser imports the
+compiled extension transparently when it has been built.
+"""
+
+NOTE_NAMES = ["C", "C#", "D", "D#", "E", "F", "F#", "G", "G#", "A", "A#", "B"]
+
+# Root-relative interval bits: bit k is set when a note lies k semitones
+# (mod 12) above the bass.
+BIT_9 = 1 << 2     # 9th (same as 2nd)
+BIT_MIN3 = 1 << 3  # Minor third
+BIT_MAJ3 = 1 << 4  # Major third
+BIT_11 = 1 << 5    # 11th (same as 4th)
+BIT_DIM5 = 1 << 6  # Diminished fifth / tritone
+BIT_P5 = 1 << 7    # Perfect fifth
+BIT_AUG5 = 1 << 8  # Augmented fifth
+BIT_13 = 1 << 9    # 13th (same as 6th)
+BIT_MIN7 = 1 << 10 # Minor seventh
+BIT_MAJ7 = 1 << 11 # Major seventh
+
+def classify_chord_mask(root_pc: int, rel_mask: int) -> str:
+    """Name a chord of three or more notes from its interval bitmask.
+
+    ``root_pc`` is the pitch class of the bass (0 = C) and ``rel_mask`` has
+    bit k set for every note (other than the bass itself) lying k semitones
+    above the bass. The "(N)" note-count suffix for very dense chords is
+    added by the caller.
+    """
+    # Get the root (lowest note)
+    root_name = NOTE_NAMES[root_pc]
+    
+    # Enhanced chord recognition
+    has_maj3 = (rel_mask & BIT_MAJ3) != 0
+    has_min3 = (rel_mask & BIT_MIN3) != 0
+    has_p5 = (rel_mask & BIT_P5) != 0
+    has_dim5 = (rel_mask & BIT_DIM5) != 0
+    has_aug5 = (rel_mask & BIT_AUG5) != 0
+    has_min7 = (rel_mask & BIT_MIN7) != 0
+    has_maj7 = (rel_mask & BIT_MAJ7) != 0
+    has_9 = (rel_mask & BIT_9) != 0
+    has_11 = (rel_mask & BIT_11) != 0
+    has_13 = (rel_mask & BIT_13) != 0
+    
+    # Build chord name step by step
+    chord_name = root_name
+    
+    # Determine basic quality (major/minor/diminished/augmented)
+    if has_min3 and has_dim5:
+        chord_name += "dim"
+    elif has_min3:
+        chord_name += "m"
+    elif has_maj3 and has_aug5:
+        chord_name += "aug"
+    elif has_maj3 and has_p5:
+        pass  # Major chord, no modifier needed
+    elif has_maj3 and has_dim5:
+        chord_name += "7"  # Dominant (tritone substitution)
+    elif not has_maj3 and not has_min3:
+        # No third, might be sus or quartal
+        if has_11:  # 4th instead of 3rd
+            chord_name += "sus4"
+        elif has_9:  # 2nd instead of 3rd
+            chord_name += "sus2"
+    
+    # Add 7th extensions
+    if has_maj7:
+        chord_name += "maj7"
+    elif has_min7:
+        chord_name += "7"
+    
+    # Add upper extensions (9th, 11th, 13th), using the highest one
+    extension = ""
+    if has_13:
+        extension = "13"
+    elif has_11:
+        extension = "11"
+    elif has_9:
+        extension = "9"
+    
+    if extension:
+        # Remove "7" if we're adding higher extensions
+        if chord_name.endswith("7") and not chord_name.endswith("maj7"):
+            chord_name = chord_name[:-1]
+        chord_name += extension
+    
+    return chord_name
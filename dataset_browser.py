@@ -9,18 +9,392 @@ import os
 import json
 import pickle
 import random
+import sqlite3
+import time
 import argparse
-from typing import List, Dict, Any, Optional
+import contextlib
+import functools
+import hashlib
+import itertools
+import operator
+from array import array
+from collections import OrderedDict, defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+from types import MappingProxyType
+from typing import List, Dict, Any, BinaryIO, Callable, Iterable, Iterator, Mapping, Optional, Sequence, Tuple
 
-def load_chord_dataset(pickle_path: str) -> List[tuple]:
-    """Load the chord progression dataset from pickle file."""
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:
+    # Windows: byte-range locks instead of flock
+    fcntl = None
+    import msvcrt
+
+import chord_classify
+from chord_classify import NOTE_NAMES, classify_chord_mask
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# music21 names chords itself; the table/JIT fast paths only apply without it.
+# Imported once here so chord naming never pays for an import per call.
+try:
+    import music21
+    from music21 import chord as m21chord
+    from music21.harmony import chordSymbolFigureFromChord
+    MUSIC21_AVAILABLE = True
+    MUSIC21_VERSION = getattr(music21, '__version__', '')  # type: Optional[str]
+except Exception:
+    # music21 not installed, outdated or failing to initialise: basic logic only
+    MUSIC21_AVAILABLE = False
+    MUSIC21_VERSION = None
+
+# Per-progression chord-name cache for analysis and page rendering.
+# Bounded LRU sized for pages/queries, not the dataset: full passes
+# (search corpus, filtering) convert without it so memory stays flat;
+# set the cap to 0/None to disable eviction.
+_PROG_CHORD_CACHE_MAXSIZE = 10_000
+_prog_chord_cache = OrderedDict()  # type: OrderedDict[tuple, List[str]]
+
+# Derived data is persisted next to the dataset pickle as "<pickle><suffix>"
+CHORDSTR_SUFFIX = '.chordstr.pkl'
+BYLEN_SUFFIX = '.bylen.pkl'
+ARRAYS_SUFFIX = '.arrays.pkl'
+PITCHES_SUFFIX = '.pitches.npy'
+CHORD_SIZES_SUFFIX = '.chord_sizes.npy'
+PROG_OFFSETS_SUFFIX = '.prog_offsets.npy'
+PROG_NOTE_OFFSETS_SUFFIX = '.prog_note_offsets.npy'
+NAMES_DB_SUFFIX = '.names.sqlite'
+SIDECAR_LOCK_SUFFIX = '.sidecar.lock'
+
+# Progression rows buffered per write in export_lua_index
+LUA_EXPORT_BATCH = 1000
+# Exports at least this large are rendered by a process pool
+LUA_PARALLEL_MIN = 50_000
+# Rows per process-pool task; at most two tasks per worker are in flight
+LUA_PARALLEL_CHUNK = 10_000
+
+@functools.lru_cache(maxsize=None)
+def _chord_rules_hash() -> Optional[str]:
+    """Hash of the chord-naming sources (this file and chord_classify).
+
+    Anything cached from chord names is keyed on it, so editing the
+    classification rules invalidates those caches. None if unreadable.
+    """
+    source_hash = hashlib.sha1()
     try:
-        with open(pickle_path, 'rb') as f:
-            data = pickle.load(f)
-        
-        # Convert set to list if necessary
-        if isinstance(data, set):
-            data = list(data)
+        for path in (__file__, chord_classify.__file__):
+            with open(path, 'rb') as f:
+                source_hash.update(f.read())
+    except OSError:
+        return None
+    return source_hash.hexdigest()
+
+def _sidecar_header(pickle_path: str, chord_names: bool = False) -> Dict[str, Any]:
+    """Describe the source pickle so stale sidecar files can be detected.
+
+    Pass ``chord_names=True`` for sidecars holding derived chord names;
+    their header also records the naming rules and music21 version.
+    """
+    stat = os.stat(pickle_path)
+    header = {
+        "source_size": stat.st_size,
+        "source_mtime_ns": stat.st_mtime_ns,
+    }  # type: Dict[str, Any]
+    if chord_names:
+        header["chord_rules"] = _chord_rules_hash()
+        # chord names differ depending on whether (and which) music21 is available
+        header["music21"] = MUSIC21_VERSION
+    return header
+
+def _load_sidecar(pickle_path: str, suffix: str, chord_names: bool = False) -> Optional[Any]:
+    """Return the payload of a sidecar pickle, or None if missing or stale."""
+    try:
+        with open(pickle_path + suffix, 'rb') as f:
+            header, payload = pickle.load(f)
+        if header != _sidecar_header(pickle_path, chord_names):
+            return None
+        return payload
+    except Exception:
+        return None
+
+def _atomic_write(path: str, write: Callable[[BinaryIO], Any]) -> None:
+    """Write ``path`` through ``write(file)`` on a temp file, then rename it into place.
+
+    Other runs that have the old file open or memory-mapped keep reading
+    it intact instead of seeing it truncated.
+    """
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            write(f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(tmp_path)
+        raise
+
+def _save_sidecar(pickle_path: str, suffix: str, payload: Any, chord_names: bool = False) -> bool:
+    """Persist derived data next to the dataset pickle (best effort)."""
+    header = _sidecar_header(pickle_path, chord_names)
+    try:
+        _atomic_write(pickle_path + suffix, lambda f: pickle.dump(
+            (header, payload), f, protocol=pickle.HIGHEST_PROTOCOL))
+        return True
+    except Exception as e:
+        print(f"⚠️ Could not write {pickle_path + suffix}: {e}")
+        return False
+
+def _try_lock(fd: int) -> bool:
+    """Take a non-blocking exclusive OS lock on ``fd``; False if it is held elsewhere."""
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+        return True
+    except OSError:
+        return False
+
+@contextlib.contextmanager
+def _exclusive_lock(lock_path: str, timeout: float = 600.0):
+    """Hold an OS lock on ``lock_path`` so concurrent CLI runs don't clobber each other's work.
+
+    The lock belongs to the process, so a run that is killed releases it
+    and never leaves a stale lock behind. The lock file itself is left in
+    place. Raises TimeoutError if the lock is not acquired in time.
+    """
+    fd = os.open(lock_path, os.O_CREAT | os.O_RDWR)
+    try:
+        deadline = time.monotonic() + timeout
+        while not _try_lock(fd):
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"Timed out waiting for lock {lock_path}")
+            time.sleep(0.5)
+        yield
+    finally:
+        # Closing the descriptor releases the lock on every platform
+        os.close(fd)
+
+class ChordView(Sequence):
+    """Zero-copy view of one chord's notes inside the flat ``pitches`` array.
+
+    Wraps a ``memoryview`` slice, so no per-note Python objects exist until
+    the notes are read. Compares and hashes like the equivalent note tuple,
+    so it can be passed to the chord-naming helpers and their caches.
+    """
+
+    __slots__ = ('_notes',)
+
+    def __init__(self, notes: memoryview):
+        self._notes = notes
+
+    def __len__(self) -> int:
+        return len(self._notes)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return tuple(self._notes[index].tolist())
+        return self._notes[index]
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._notes)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, ChordView):
+            other = tuple(other)
+        return tuple(self._notes.tolist()) == other
+
+    def __hash__(self) -> int:
+        return hash(tuple(self._notes.tolist()))
+
+    def __repr__(self) -> str:
+        return f"ChordView({tuple(self._notes.tolist())!r})"
+
+class ProgressionArrays(Sequence):
+    """Read-only list of progressions backed by flat numpy arrays (SoA layout).
+
+    ``pitches`` holds the notes of every chord back to back, ``chord_sizes``
+    the note count of each chord and ``prog_offsets`` the cumulative chord
+    count per progression (``len(self) + 1`` entries starting at 0);
+    ``prog_note_offsets`` gives each progression's first note in
+    ``pitches``. Indexing returns a tuple of note tuples, like the original
+    pickle, so existing code keeps working; bulk operations use the arrays
+    directly, and ``chord_views`` gives zero-copy ``ChordView`` access.
+    """
+
+    def __init__(self, pitches: np.ndarray, chord_sizes: np.ndarray, prog_offsets: np.ndarray,
+                 prog_note_offsets: np.ndarray):
+        self.pitches = pitches
+        self.chord_sizes = chord_sizes
+        self.prog_offsets = prog_offsets
+        self.prog_note_offsets = prog_note_offsets
+        self._note_offsets = None  # type: Optional[np.ndarray]
+        self._pitch_view = None  # type: Optional[memoryview]
+
+    @property
+    def note_offsets(self) -> np.ndarray:
+        """Offset of every chord's first note in ``pitches`` (built on first use)."""
+        if self._note_offsets is None:
+            self._note_offsets = _chord_note_offsets(self.chord_sizes)
+        return self._note_offsets
+
+    def __len__(self) -> int:
+        return len(self.prog_offsets) - 1
+
+    def _check_index(self, index) -> int:
+        index = operator.index(index)
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("progression index out of range")
+        return index
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+
+        index = self._check_index(index)
+
+        # Two slices of the (memory-mapped) arrays; nothing else is touched
+        first, last = int(self.prog_offsets[index]), int(self.prog_offsets[index + 1])
+        sizes = self.chord_sizes[first:last].tolist()
+        start = int(self.prog_note_offsets[index])
+        notes = self.pitches[start:start + sum(sizes)].tolist()
+        progression = []
+        pos = 0
+        for size in sizes:
+            progression.append(tuple(notes[pos:pos + size]))
+            pos += size
+        return tuple(progression)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def chord(self, chord_index: int) -> ChordView:
+        """Return chord ``chord_index`` (over the whole dataset) as a ``ChordView``."""
+        if self._pitch_view is None:
+            self._pitch_view = memoryview(self.pitches)
+        note_offsets = self.note_offsets
+        return ChordView(self._pitch_view[int(note_offsets[chord_index]):int(note_offsets[chord_index + 1])])
+
+    def chord_views(self, index: int) -> Tuple[ChordView, ...]:
+        """Return progression ``index`` as ``ChordView`` objects instead of tuples.
+
+        Nothing is copied out of ``pitches``; use this for read-only passes
+        that would otherwise build a note tuple per chord.
+        """
+        index = self._check_index(index)
+        first, last = int(self.prog_offsets[index]), int(self.prog_offsets[index + 1])
+        return tuple(self.chord(c) for c in range(first, last))
+
+    def lengths(self) -> np.ndarray:
+        """Return the chord count of every progression."""
+        return np.diff(self.prog_offsets)
+
+def _chord_note_offsets(chord_sizes: np.ndarray) -> np.ndarray:
+    """Cumulative note count before each chord (``len(chord_sizes) + 1`` entries)."""
+    note_offsets = np.zeros(len(chord_sizes) + 1, dtype=np.int64)
+    np.cumsum(chord_sizes, dtype=np.int64, out=note_offsets[1:])
+    return note_offsets
+
+def _load_pickle(pickle_path: str) -> List[tuple]:
+    """Read the original chord progression pickle."""
+    with open(pickle_path, 'rb') as f:
+        data = pickle.load(f)
+    
+    # Convert set to list if necessary
+    if isinstance(data, set):
+        data = list(data)
+    return data
+
+def build_sidecar(pickle_path: str, progressions: Optional[Sequence[tuple]] = None) -> bool:
+    """Convert a dataset pickle into memory-mappable ``.npy`` sidecar files.
+
+    Writes ``<pickle>.pitches.npy`` (uint8 notes), ``<pickle>.chord_sizes.npy``
+    (uint16 notes per chord), ``<pickle>.prog_offsets.npy`` (uint32
+    cumulative chord count per progression) and
+    ``<pickle>.prog_note_offsets.npy`` (int64 first note of each
+    progression). Files are replaced atomically under a lock, so runs that
+    have the old sidecar mapped are unaffected and concurrent first runs
+    build it once. Returns True on success (or if another run already
+    built it) and False if the dataset cannot be converted or written.
+    """
+    if progressions is None:
+        progressions = _load_pickle(pickle_path)
+
+    try:
+        with _exclusive_lock(pickle_path + SIDECAR_LOCK_SUFFIX):
+            if _load_arrays(pickle_path) is not None:
+                return True
+
+            pitches = bytearray()
+            chord_sizes = array('H')
+            prog_lengths = array('I')
+            for prog in progressions:
+                prog_lengths.append(len(prog))
+                for chord in prog:
+                    chord_sizes.append(len(chord))
+                    pitches.extend(chord)
+
+            prog_offsets = np.zeros(len(prog_lengths) + 1, dtype=np.uint32)
+            np.cumsum(np.array(prog_lengths, dtype=np.uint32), out=prog_offsets[1:])
+            chord_sizes = np.array(chord_sizes, dtype=np.uint16)
+            arrays = {
+                PITCHES_SUFFIX: np.frombuffer(pitches, dtype=np.uint8),
+                CHORD_SIZES_SUFFIX: chord_sizes,
+                PROG_OFFSETS_SUFFIX: prog_offsets,
+                PROG_NOTE_OFFSETS_SUFFIX: _chord_note_offsets(chord_sizes)[prog_offsets],
+            }
+            for suffix, values in arrays.items():
+                _atomic_write(pickle_path + suffix, lambda f: np.save(f, values))
+            # Written last so a partially written sidecar is never picked up
+            return _save_sidecar(pickle_path, ARRAYS_SUFFIX, {"progressions": len(prog_lengths)})
+    except Exception as e:
+        # e.g. notes outside 0-255, unexpected item types or a read-only folder
+        print(f"⚠️ Could not build numpy sidecar for {pickle_path}: {e}")
+        return False
+
+def _load_arrays(pickle_path: str) -> Optional[ProgressionArrays]:
+    """Memory-map the numpy sidecar, or return None if it is missing or stale."""
+    meta = _load_sidecar(pickle_path, ARRAYS_SUFFIX)
+    if meta is None:
+        return None
+    try:
+        dataset = ProgressionArrays(
+            np.load(pickle_path + PITCHES_SUFFIX, mmap_mode='r'),
+            np.load(pickle_path + CHORD_SIZES_SUFFIX, mmap_mode='r'),
+            np.load(pickle_path + PROG_OFFSETS_SUFFIX, mmap_mode='r'),
+            np.load(pickle_path + PROG_NOTE_OFFSETS_SUFFIX, mmap_mode='r'),
+        )
+    except (OSError, ValueError):
+        return None
+    return dataset if len(dataset) == meta["progressions"] else None
+
+def load_chord_dataset(pickle_path: str) -> Sequence[tuple]:
+    """Load the chord progression dataset.
+
+    The pickle is converted once into a numpy sidecar (see ``build_sidecar``)
+    which later loads memory-map instead of unpickling. If the sidecar
+    cannot be written the unpickled list is returned as before.
+    """
+    try:
+        data = _load_arrays(pickle_path)
+        if data is None:
+            data = _load_pickle(pickle_path)
+            print(f"🛠 Building numpy sidecar for {pickle_path}")
+            if build_sidecar(pickle_path, data):
+                data = _load_arrays(pickle_path) or data
             
         print(f"✅ Loaded dataset with {len(data)} progressions")
         return data
@@ -28,151 +402,400 @@ def load_chord_dataset(pickle_path: str) -> List[tuple]:
         print(f"❌ Error loading dataset: {e}")
         return []
 
+def load_progression(pickle_path: str, progression_id: int) -> Optional[tuple]:
+    """Read one progression straight from the numpy sidecar.
+
+    Only the sidecar headers and the progression's own slices are read, so
+    this avoids loading the dataset. Returns None if the sidecar is missing
+    or stale, or the ID is out of range.
+    """
+    dataset = _load_arrays(pickle_path)
+    if dataset is None or not 0 <= progression_id < len(dataset):
+        return None
+    return dataset[progression_id]
+
+@functools.lru_cache(maxsize=100_000)
+def _music21_chord_symbol(voicing: tuple) -> str:
+    """Return the music21 chord symbol for a voicing, or "" on failure.
+
+    Only call when ``MUSIC21_AVAILABLE``. The key keeps the note order
+    given by the caller because music21 spells enharmonics from it. Only
+    the resulting string is cached; the music21 objects are discarded.
+    """
+    try:
+        m21_chord = m21chord.Chord(voicing)
+        return chordSymbolFigureFromChord(m21_chord) or ""
+    except Exception:
+        # any chord parsing errors, fallback
+        return ""
+
+def _build_chord_table() -> List[str]:
+    """Classify every (root_pc, rel_mask) pair, indexed by ``root_pc << 12 | rel_mask``."""
+    return [classify_chord_mask(root_pc, rel_mask)
+            for root_pc in range(12) for rel_mask in range(4096)]
+
+def _load_chord_table() -> List[str]:
+    """Load the chord table cached next to this module, rebuilding it if stale.
+
+    The cache is keyed by ``_chord_rules_hash``, so any edit to the
+    classification rules (or a recompiled chord_classify) invalidates it.
+    """
+    source_hash = _chord_rules_hash()
+    if source_hash is None:
+        return _build_chord_table()
+
+    try:
+        with open(CHORD_TABLE_PATH, 'rb') as f:
+            cached_hash, table = pickle.load(f)
+        if cached_hash == source_hash:
+            return table
+    except Exception:
+        pass
+
+    table = _build_chord_table()
+    try:
+        with open(CHORD_TABLE_PATH, 'wb') as f:
+            pickle.dump((source_hash, table), f, protocol=pickle.HIGHEST_PROTOCOL)
+    except OSError:
+        pass  # read-only install; rebuild on every import instead
+    return table
+
+# Number of intervals in each mask (int.bit_count needs Python 3.10)
+_MASK_POPCOUNT = [bin(rel_mask).count("1") for rel_mask in range(4096)]
+
+# Names for all 12 x 4096 chords of three or more notes, built at import
+CHORD_TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'chord_table.pkl')
+_CHORD_TABLE = _load_chord_table()
+
 def midi_notes_to_chord_name(notes_tuple):
     """Convert MIDI note numbers to chord name."""
     if not notes_tuple:
         return "Rest"
 
     # try using music21 for advanced chord recognition and full-symbol display
-    try:
-        from music21 import chord as m21chord
-        from music21.harmony import chordSymbolFigureFromChord
-        m21_chord = m21chord.Chord(notes_tuple)
-        symbol = chordSymbolFigureFromChord(m21_chord)
+    if MUSIC21_AVAILABLE:
+        symbol = _music21_chord_symbol(tuple(notes_tuple))
         if symbol:
             return symbol
-    except ImportError:
-        # music21 not installed or outdated, fallback to basic logic
-        pass
-    except Exception:
-        # any chord parsing errors, fallback
-        pass
 
-    notes = sorted(list(notes_tuple))
-    
-    # Convert MIDI numbers to note names
-    note_names = ["C", "C#", "D", "D#", "E", "F", "F#", "G", "G#", "A", "A#", "B"]
-    
+    voicing = tuple(sorted(notes_tuple))
+
     # Get the root (lowest note)
-    root_note = notes[0] % 12
-    root_name = note_names[root_note]
+    bass = voicing[0]
+    root_pc = bass % 12
     
     # Simple chord quality detection based on intervals
-    if len(notes) == 1:
-        return root_name
-    elif len(notes) == 2:
-        interval = (notes[1] - notes[0]) % 12
-        if interval == 7:
-            return root_name + "5"  # Perfect fifth
-        else:
-            return root_name + "2"  # Generic interval
-    elif len(notes) >= 3:
-        # Get intervals from root (remove duplicates and sort)
-        intervals = sorted(list(set([(note - notes[0]) % 12 for note in notes[1:]])))
-        
-        # Enhanced chord recognition
-        has_maj3 = 4 in intervals   # Major third
-        has_min3 = 3 in intervals   # Minor third
-        has_p5 = 7 in intervals     # Perfect fifth
-        has_dim5 = 6 in intervals   # Diminished fifth / tritone
-        has_aug5 = 8 in intervals   # Augmented fifth
-        has_min7 = 10 in intervals  # Minor seventh
-        has_maj7 = 11 in intervals  # Major seventh
-        has_9 = 2 in intervals      # 9th (same as 2nd)
-        has_11 = 5 in intervals     # 11th (same as 4th)
-        has_13 = 9 in intervals     # 13th (same as 6th)
-        
-        # Build chord name step by step
-        chord_name = root_name
-        
-        # Determine basic quality (major/minor/diminished/augmented)
-        if has_min3 and has_dim5:
-            chord_name += "dim"
-        elif has_min3:
-            chord_name += "m"
-        elif has_maj3 and has_aug5:
-            chord_name += "aug"
-        elif has_maj3 and has_p5:
-            pass  # Major chord, no modifier needed
-        elif has_maj3 and has_dim5:
-            chord_name += "7"  # Dominant (tritone substitution)
-        elif not has_maj3 and not has_min3:
-            # No third, might be sus or quartal
-            if has_11:  # 4th instead of 3rd
-                chord_name += "sus4"
-            elif has_9:  # 2nd instead of 3rd
-                chord_name += "sus2"
-        
-        # Add 7th extensions
-        if has_maj7:
-            if "m" in chord_name:
-                chord_name += "maj7"
-            else:
-                chord_name += "maj7"
-        elif has_min7:
-            chord_name += "7"
-        
-        # Add upper extensions (9th, 11th, 13th)
-        extensions = []
-        if has_13:
-            extensions.append("13")
-        elif has_11:
-            extensions.append("11")
-        elif has_9:
-            extensions.append("9")
-        
-        if extensions:
-            # Remove "7" if we're adding higher extensions
-            if chord_name.endswith("7") and not chord_name.endswith("maj7"):
-                chord_name = chord_name[:-1]
-            chord_name += extensions[0]  # Use highest extension
-        
-        # Handle special cases where our analysis might be incomplete
-        if len(intervals) > 5:  # Very complex chord
-            return f"{chord_name}({len(notes)})"
-        
-        return chord_name
-    
-    return root_name
+    if len(voicing) == 1:
+        return NOTE_NAMES[root_pc]
+    elif len(voicing) == 2:
+        if (voicing[1] - bass) % 12 == 7:
+            return NOTE_NAMES[root_pc] + "5"  # Perfect fifth
+        return NOTE_NAMES[root_pc] + "2"  # Generic interval
 
-def midi_notes_to_note_names(notes_tuple):
-    """Convert MIDI note numbers to readable note names with octaves."""
-    if not notes_tuple:
-        return []
+    rel_mask = 0
+    for note in voicing[1:]:
+        rel_mask |= 1 << ((note - bass) % 12)
+
+    chord_name = _CHORD_TABLE[(root_pc << 12) | rel_mask]
+
+    # Handle special cases where our analysis might be incomplete
+    if _MASK_POPCOUNT[rel_mask] > 5:  # Very complex chord
+        return f"{chord_name}({len(voicing)})"
     
-    note_names = ["C", "C#", "D", "D#", "E", "F", "F#", "G", "G#", "A", "A#", "B"]
+    return chord_name
+
+REST_ID = 0
+
+def _representative_voicing(root_pc: int, rel_mask: int) -> List[int]:
+    """A voicing of three or more notes with the given bass pitch class and interval mask."""
+    bass = 48 + root_pc
+    voicing = [bass] + [bass + (interval or 12) for interval in range(12) if rel_mask >> interval & 1]
+    while len(voicing) < 3:
+        # An octave doubling of the top note leaves the mask unchanged
+        voicing.append(voicing[-1] + 12)
+    return voicing
+
+@functools.lru_cache(maxsize=None)
+def _chord_id_tables() -> Tuple[List[str], np.ndarray, np.ndarray]:
+    """Build the interned chord-name vocabulary and ID lookup tables.
+
+    Returns ``(names, id_table, small_ids)`` where ``names[i]`` is the name
+    for ID ``i``, ``id_table[root_pc, rel_mask]`` names chords of three or
+    more notes and ``small_ids[k, root_pc]`` names one-note (k=0) and
+    two-note chords (k=1 + interval above the bass). Every entry comes from
+    ``midi_notes_to_chord_name`` on a representative voicing, so the
+    tables follow any change to the naming rules. Masks whose name also
+    depends on the note count are marked -1.
+    """
+    names = ["Rest"]
+    ids = {"Rest": REST_ID}
+
+    def intern(name):
+        if name not in ids:
+            ids[name] = len(names)
+            names.append(name)
+        return ids[name]
+
+    chord_name = midi_notes_to_chord_name
+    small_ids = np.empty((13, 12), dtype=np.int32)
+    id_table = np.empty((12, 4096), dtype=np.int32)
+    for root_pc in range(12):
+        bass = 48 + root_pc
+        small_ids[0, root_pc] = intern(chord_name((bass,)))
+        for interval in range(12):
+            small_ids[1 + interval, root_pc] = intern(chord_name((bass, bass + (interval or 12))))
+        for rel_mask in range(1, 4096):
+            voicing = _representative_voicing(root_pc, rel_mask)
+            name = chord_name(tuple(voicing))
+            doubled = chord_name(tuple(voicing + [voicing[-1] + 12]))
+            id_table[root_pc, rel_mask] = intern(name) if name == doubled else -1
+        # Three or more notes always set at least one interval bit
+        id_table[root_pc, 0] = -1
+    return names, id_table, small_ids
+
+if numba is not None:
+    @numba.njit(cache=True, parallel=True)
+    def _chord_ids_kernel(pitches, note_offsets, id_table, small_ids, out_ids):
+        """Assign a chord-name ID to every chord; -1 marks chords named by note count."""
+        for c in numba.prange(out_ids.shape[0]):
+            start = note_offsets[c]
+            end = note_offsets[c + 1]
+            if end == start:
+                out_ids[c] = REST_ID
+                continue
+
+            bass = int(pitches[start])
+            for k in range(start + 1, end):
+                if pitches[k] < bass:
+                    bass = int(pitches[k])
+            root_pc = bass % 12
+
+            # Same mask as midi_notes_to_chord_name: every note but one bass
+            rel_mask = 0
+            interval = 0
+            skipped_bass = False
+            for k in range(start, end):
+                note = int(pitches[k])
+                if note == bass and not skipped_bass:
+                    skipped_bass = True
+                else:
+                    interval = (note - bass) % 12
+                    rel_mask |= 1 << interval
+
+            if end - start == 1:
+                out_ids[c] = small_ids[0, root_pc]
+            elif end - start == 2:
+                out_ids[c] = small_ids[1 + interval, root_pc]
+            else:
+                out_ids[c] = id_table[root_pc, rel_mask]
+
+def chord_name_ids(dataset: "ProgressionArrays") -> Optional[np.ndarray]:
+    """Return an int32 chord-name ID per chord of an array-backed dataset.
+
+    IDs index ``_chord_id_tables()[0]``; -1 marks chords (very dense ones)
+    whose name includes the note count and must come from
+    ``midi_notes_to_chord_name``. Returns None when the JIT path does not
+    apply (numba missing, or music21 supplying the names).
+    """
+    if numba is None or MUSIC21_AVAILABLE:
+        return None
+    _, id_table, small_ids = _chord_id_tables()
+    out_ids = np.empty(len(dataset.chord_sizes), dtype=np.int32)
+    _chord_ids_kernel(dataset.pitches, dataset.note_offsets, id_table, small_ids, out_ids)
+    return out_ids
+
+@functools.lru_cache(maxsize=200_000)
+def _note_names(notes: tuple) -> Tuple[str, ...]:
+    """Cached body of ``midi_notes_to_note_names``."""
     result = []
     
-    for midi_note in sorted(notes_tuple):
+    for midi_note in sorted(notes):
         octave = (midi_note // 12) - 1  # MIDI octave calculation
-        note_name = note_names[midi_note % 12]
+        note_name = NOTE_NAMES[midi_note % 12]
         result.append(f"{note_name}{octave}")
     
-    return result
+    return tuple(result)
 
-def get_chord_analysis(notes_tuple):
-    """Get detailed chord analysis including name and constituent notes."""
-    chord_name = midi_notes_to_chord_name(notes_tuple)
-    note_names = midi_notes_to_note_names(notes_tuple)
-    
-    return {
-        "chord_name": chord_name,
-        "notes": note_names,
-        "midi_notes": list(sorted(notes_tuple)) if notes_tuple else [],
-        "note_count": len(notes_tuple) if notes_tuple else 0
-    }
+def midi_notes_to_note_names(notes_tuple) -> Tuple[str, ...]:
+    """Convert MIDI note numbers to readable note names with octaves.
+
+    Results are cached, so the returned names are an immutable tuple.
+    """
+    if not notes_tuple:
+        return ()
+    return _note_names(tuple(notes_tuple))
+
+@functools.lru_cache(maxsize=200_000)
+def _chord_analysis(notes: tuple) -> Mapping[str, Any]:
+    """Cached body of ``get_chord_analysis``."""
+    return MappingProxyType({
+        "chord_name": midi_notes_to_chord_name(notes),
+        "notes": midi_notes_to_note_names(notes),
+        "midi_notes": tuple(sorted(notes)),
+        "note_count": len(notes)
+    })
+
+def get_chord_analysis(notes_tuple) -> Mapping[str, Any]:
+    """Get detailed chord analysis including name and constituent notes.
+
+    Results are cached and shared, so a read-only mapping is returned.
+    Any iterable of MIDI notes is accepted; it is keyed as a tuple.
+    """
+    return _chord_analysis(tuple(notes_tuple) if notes_tuple else ())
+
+def _progression_chord_names(progression) -> List[str]:
+    """Return the cached chord-name list for a progression.
+
+    The returned list is shared with the cache and must not be mutated.
+    Progressions that are not hashable are converted without caching.
+    """
+    chord_name = midi_notes_to_chord_name
+    try:
+        cached = _prog_chord_cache.get(progression)
+    except TypeError:
+        return [chord_name(chord_tuple) for chord_tuple in progression]
+
+    if cached is not None:
+        _prog_chord_cache.move_to_end(progression)
+        return cached
+
+    chords = [chord_name(chord_tuple) for chord_tuple in progression]
+
+    _prog_chord_cache[progression] = chords
+    if _PROG_CHORD_CACHE_MAXSIZE and len(_prog_chord_cache) > _PROG_CHORD_CACHE_MAXSIZE:
+        _prog_chord_cache.popitem(last=False)
+    return chords
 
 def convert_progression_to_chords(progression) -> List[str]:
     """Convert progression of MIDI note tuples to chord names."""
-    chords = []
-    for chord_tuple in progression:
-        chord_name = midi_notes_to_chord_name(chord_tuple)
-        chords.append(chord_name)
-    return chords
+    return list(_progression_chord_names(progression))
+
+class ChordNameCache:
+    """Chord names per progression ID, persisted in SQLite next to the dataset.
+
+    Naming is cheap with the built-in table but slow with music21, so names
+    are kept across CLI runs in ``<pickle>.names.sqlite``. The cache is
+    cleared whenever the source pickle, the chord-naming rules or the
+    music21 version change, and a corrupt database file is discarded and
+    rebuilt. Use as a context manager so new rows are committed on exit.
+    """
+
+    def __init__(self, pickle_path: str):
+        self._names = {}  # type: Dict[int, List[str]]
+        self._pending = []  # type: List[Tuple[int, bytes]]
+        self._db_path = pickle_path + NAMES_DB_SUFFIX
+        self._conn = None  # type: Optional[sqlite3.Connection]
+        try:
+            try:
+                self._conn = self._open(pickle_path)
+            except sqlite3.OperationalError:
+                raise
+            except sqlite3.DatabaseError:
+                # Not a usable database (e.g. torn by a crash): start afresh
+                print(f"⚠️ Rebuilding corrupt chord name cache {self._db_path}")
+                os.remove(self._db_path)
+                self._conn = self._open(pickle_path)
+        except (sqlite3.Error, OSError) as e:
+            # e.g. read-only dataset folder; names are then only cached in memory
+            print(f"⚠️ Chord name cache unavailable: {e}")
+            self._conn = None
+
+    def _open(self, pickle_path: str) -> sqlite3.Connection:
+        conn = sqlite3.connect(self._db_path)
+        try:
+            # Read-mostly cache: a file corrupted by a crash is deleted and rebuilt
+            conn.execute('PRAGMA synchronous=OFF')
+            conn.execute('PRAGMA journal_mode=MEMORY')
+            conn.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)')
+            conn.execute('CREATE TABLE IF NOT EXISTS prog_names '
+                         '(prog_id INTEGER PRIMARY KEY, names_blob BLOB)')
+
+            source = json.dumps(_sidecar_header(pickle_path, chord_names=True), sort_keys=True)
+            row = conn.execute("SELECT value FROM meta WHERE key = 'source'").fetchone()
+            if row is None or row[0] != source:
+                conn.execute('DELETE FROM prog_names')
+                conn.execute("INSERT OR REPLACE INTO meta VALUES ('source', ?)", (source,))
+                conn.commit()
+        except BaseException:
+            # Release the file before the caller deletes it (Windows keeps it locked)
+            conn.close()
+            raise
+        return conn
+
+    def _disable(self, error: sqlite3.Error) -> None:
+        """Stop using the database after an error, keeping names in memory only."""
+        print(f"⚠️ Chord name cache unavailable: {error}")
+        try:
+            self._conn.close()
+        except sqlite3.Error:
+            pass
+        self._conn = None
+        self._pending = []
+        if not isinstance(error, sqlite3.OperationalError):
+            # Corrupt file: remove it so the next run rebuilds the cache
+            try:
+                os.remove(self._db_path)
+            except OSError:
+                pass
+
+    def __enter__(self) -> 'ChordNameCache':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def prefetch(self, prog_ids: Iterable[int]) -> None:
+        """Load the stored names for several progressions in one query."""
+        if self._conn is None:
+            return
+        missing = [prog_id for prog_id in prog_ids if prog_id not in self._names]
+        try:
+            # Stay below SQLite's host-parameter limit (999 on older builds)
+            for start in range(0, len(missing), 500):
+                chunk = missing[start:start + 500]
+                placeholders = ', '.join('?' * len(chunk))
+                rows = self._conn.execute(
+                    f'SELECT prog_id, names_blob FROM prog_names WHERE prog_id IN ({placeholders})',
+                    chunk)
+                for prog_id, blob in rows:
+                    self._names[prog_id] = blob.decode('utf-8').split('\t') if blob else []
+        except sqlite3.DatabaseError as e:
+            self._disable(e)
 
-def analyze_progression(progression) -> Dict[str, Any]:
-    """Analyze a chord progression for complexity, patterns, etc."""
-    chord_names = convert_progression_to_chords(progression)
+    def chord_names(self, prog_id: int, progression) -> List[str]:
+        """Return the chord names of a progression, converting and storing on a miss."""
+        names = self._names.get(prog_id)
+        if names is None:
+            self.prefetch([prog_id])
+            names = self._names.get(prog_id)
+        if names is None:
+            names = self._names[prog_id] = convert_progression_to_chords(progression)
+            self._pending.append((prog_id, '\t'.join(names).encode('utf-8')))
+        return list(names)
+
+    def close(self) -> None:
+        """Write newly converted names and close the database."""
+        if self._conn is None:
+            return
+        try:
+            if self._pending:
+                self._conn.executemany('INSERT OR REPLACE INTO prog_names VALUES (?, ?)',
+                                       self._pending)
+                self._conn.commit()
+                self._pending = []
+            self._conn.close()
+        except sqlite3.DatabaseError as e:
+            self._disable(e)
+        self._conn = None
+
+def analyze_progression(progression, chord_names: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Analyze a chord progression for complexity, patterns, etc.
+
+    Pass ``chord_names`` when the caller already converted the progression;
+    the list is used as-is in the result.
+    """
+    if chord_names is None:
+        chord_names = convert_progression_to_chords(progression)
     
     # Calculate complexity based on chord variety and note density
     note_counts = [len(chord_tuple) for chord_tuple in progression]
@@ -209,35 +832,112 @@ def analyze_progression(progression) -> Dict[str, Any]:
     
     return analysis
 
-def browse_dataset(dataset: List[tuple], page: int = 1, items_per_page: int = 10,
-                  search_query: str = "", min_length: int = 0) -> Dict[str, Any]:
-    """Browse the dataset with pagination and filtering."""
+def _chord_search_string(progression) -> str:
+    """Lowercased chord names of a progression, one per line, for substring search.
+
+    Deliberately uncached: this runs once per progression over the whole
+    dataset, and caching would keep every progression tuple alive.
+    """
+    chord_name = midi_notes_to_chord_name
+    return "\n".join([chord_name(chord_tuple) for chord_tuple in progression]).lower()
+
+def build_chord_strings(dataset: Sequence[tuple]) -> List[str]:
+    """Build the lowercased chord-name search corpus, parallel to ``dataset``."""
+    ids = chord_name_ids(dataset) if isinstance(dataset, ProgressionArrays) else None
+    if ids is None:
+        return [_chord_search_string(prog) for prog in dataset]
+
+    # Materialize strings only here, from the interned vocabulary
+    lowered = [name.lower() for name in _chord_id_tables()[0]]
+    chord_names = [lowered[i] for i in ids.tolist()]
+    for c in np.flatnonzero(ids < 0).tolist():
+        chord_names[c] = midi_notes_to_chord_name(dataset.chord(c)).lower()
+
+    offsets = dataset.prog_offsets.tolist()
+    return ["\n".join(chord_names[offsets[i]:offsets[i + 1]]) for i in range(len(dataset))]
+
+def load_chord_strings(dataset: Sequence[tuple], pickle_path: str) -> List[str]:
+    """Load the search corpus from its sidecar, building and saving it if stale."""
+    chord_strings = _load_sidecar(pickle_path, CHORDSTR_SUFFIX, chord_names=True)
+    if chord_strings is None or len(chord_strings) != len(dataset):
+        chord_strings = build_chord_strings(dataset)
+        _save_sidecar(pickle_path, CHORDSTR_SUFFIX, chord_strings, chord_names=True)
+    return chord_strings
+
+def progression_lengths(dataset: Sequence[tuple]) -> np.ndarray:
+    """Return the chord count of every progression as a numpy array."""
+    if isinstance(dataset, ProgressionArrays):
+        return dataset.lengths()
+    return np.fromiter((len(prog) for prog in dataset), dtype=np.uint32, count=len(dataset))
+
+def browse_dataset(dataset: Sequence[tuple], page: int = 1, items_per_page: int = 10,
+                  search_query: str = "", min_length: int = 0,
+                  chord_strings: Optional[List[str]] = None,
+                  lengths: Optional[np.ndarray] = None,
+                  name_cache: Optional[ChordNameCache] = None) -> Dict[str, Any]:
+    """Browse the dataset with pagination and filtering.
+
+    ``chord_strings`` and ``lengths`` are optional precomputed indexes
+    (see ``load_chord_strings`` and ``progression_lengths``); they are
+    derived on the fly when not supplied. ``name_cache`` supplies chord
+    names for the page from the persistent cache.
+    """
     
-    # Apply filters
-    filtered_data = dataset
+    # Apply filters (indices into dataset; None means "everything")
+    indices = None
+    # Chord names already derived while filtering, reused for the page
+    chord_names_by_id = {}  # type: Dict[int, List[str]]
     
     if min_length > 0:
-        filtered_data = [prog for prog in filtered_data if len(prog) >= min_length]
+        if lengths is None:
+            lengths = progression_lengths(dataset)
+        # Stays a numpy array; only the page slice becomes a list
+        indices = np.flatnonzero(lengths >= min_length)
     
     # Simple search implementation (searches in converted chord names)
     if search_query:
-        search_results = []
-        for prog in filtered_data:
-            chord_names = convert_progression_to_chords(prog)
-            if any(search_query.lower() in chord.lower() for chord in chord_names):
-                search_results.append(prog)
-        filtered_data = search_results
+        query = search_query.lower()
+        candidates = range(len(dataset)) if indices is None else indices.tolist()
+        if "\n" in query:
+            # Chord names never contain the separator, so nothing can match
+            indices = []
+        elif chord_strings is not None:
+            # One C-level substring scan per progression over the lowercased corpus
+            if indices is None:
+                indices = [i for i, chord_str in enumerate(chord_strings) if query in chord_str]
+            else:
+                indices = [i for i in candidates if query in chord_strings[i]]
+        else:
+            indices = []
+            for i in candidates:
+                chord_names = [midi_notes_to_chord_name(chord_tuple) for chord_tuple in dataset[i]]
+                if query in "\n".join(chord_names).lower():
+                    indices.append(i)
+                    chord_names_by_id[i] = chord_names
     
-    # Pagination
-    total_items = len(filtered_data)
+    if indices is None:
+        indices = range(len(dataset))
+    
+    # Pagination (only the page's progressions are materialized)
+    total_items = len(indices)
     start_idx = (page - 1) * items_per_page
     end_idx = start_idx + items_per_page
-    page_data = filtered_data[start_idx:end_idx]
+    page_ids = indices[start_idx:end_idx]
+    if isinstance(page_ids, np.ndarray):
+        page_ids = page_ids.tolist()
     
     # Convert to displayable format
+    if name_cache is not None:
+        name_cache.prefetch(page_ids)
     progressions = []
-    for i, prog in enumerate(page_data):
-        analysis = analyze_progression(prog)
+    for i, prog_id in enumerate(page_ids):
+        prog = dataset[prog_id]
+        chord_names = chord_names_by_id.get(prog_id)
+        if chord_names:
+            chord_names = list(chord_names)
+        elif name_cache is not None:
+            chord_names = name_cache.chord_names(prog_id, prog)
+        analysis = analyze_progression(prog, chord_names)
         progressions.append({
             "id": start_idx + i,
             "raw_progression": prog,
@@ -257,52 +957,151 @@ def browse_dataset(dataset: List[tuple], page: int = 1, items_per_page: int = 10
         "has_previous": page > 1
     }
 
-def generate_similar_progression(template_progression: tuple, dataset: List[tuple]) -> tuple:
-    """Generate a progression similar to the template."""
+def build_length_index(dataset: Sequence[tuple]) -> Dict[int, List[int]]:
+    """Group dataset indices by progression length."""
+    by_len = defaultdict(list)  # type: Dict[int, List[int]]
+    for i, length in enumerate(progression_lengths(dataset).tolist()):
+        by_len[length].append(i)
+    return dict(by_len)
+
+def load_length_index(dataset: Sequence[tuple], pickle_path: str) -> Dict[int, List[int]]:
+    """Load the length index from its sidecar, building and saving it if stale."""
+    by_len = _load_sidecar(pickle_path, BYLEN_SUFFIX)
+    if by_len is None or sum(len(bucket) for bucket in by_len.values()) != len(dataset):
+        by_len = build_length_index(dataset)
+        _save_sidecar(pickle_path, BYLEN_SUFFIX, by_len)
+    return by_len
+
+def generate_similar_progression(template_progression: tuple, dataset: Sequence[tuple],
+                                 by_len: Optional[Dict[int, List[int]]] = None) -> tuple:
+    """Generate a progression similar to the template.
+
+    ``by_len`` is an optional precomputed ``build_length_index`` result; it
+    is built on the fly when not supplied.
+    """
     template_length = len(template_progression)
+    if by_len is None:
+        by_len = build_length_index(dataset)
     
-    # Find progressions with similar length
-    similar_length = [prog for prog in dataset if abs(len(prog) - template_length) <= 2]
+    # Find progressions with similar length (within 2 chords)
+    buckets = [by_len[length] for length in range(template_length - 2, template_length + 3)
+               if length in by_len]
+    total = sum(len(bucket) for bucket in buckets)
     
-    if similar_length:
-        return random.choice(similar_length)
-    else:
-        return random.choice(dataset)
+    if total:
+        # Uniform pick across the buckets without concatenating them
+        pick = random.randrange(total)
+        for bucket in buckets:
+            if pick < len(bucket):
+                return dataset[bucket[pick]]
+            pick -= len(bucket)
+    return random.choice(dataset)
+
+def _lua_chord_fragments(chord_tuple) -> Tuple[bytes, bytes]:
+    """Return the quoted chord name and the details table for one chord, as UTF-8."""
+    cd = get_chord_analysis(chord_tuple)
+    name = cd["chord_name"].encode('utf-8')
+    notes_str = ', '.join(['"%s"' % n for n in cd["notes"]]).encode('utf-8')
+    midi_str = ', '.join(map(str, cd["midi_notes"])).encode('ascii')
+    detail = b'{ name = "%s", notes = { %s }, midi = { %s } }' % (name, notes_str, midi_str)
+    return b'"%s"' % name, detail
+
+class _LuaFragmentCache(dict):
+    """Per-export map of chord tuple -> ``_lua_chord_fragments`` result."""
+
+    def __missing__(self, chord_tuple):
+        fragments = self[chord_tuple] = _lua_chord_fragments(chord_tuple)
+        return fragments
+
+def _lua_index_rows(progressions: Iterable[tuple], start_id: int = 0) -> Iterator[bytes]:
+    """Yield one encoded ``CHORD_INDEX`` row per progression, numbered from ``start_id``."""
+    fragments = _LuaFragmentCache()
+    for i, prog in enumerate(progressions, start_id):
+        chord_fragments = [fragments[chord_tuple] for chord_tuple in prog]
+        yield (b'  { id = %d, chords = { %s }, details = { %s } },\n'
+               % (i, b', '.join([names for names, _ in chord_fragments]),
+                  b', '.join([details for _, details in chord_fragments])))
 
-def export_lua_index(dataset: List[tuple], output_path: str, limit: int = 1000) -> None:
+def _lua_index_chunk(chunk: Tuple[int, List[tuple]]) -> bytes:
+    """Worker entry point: render a contiguous run of rows starting at ``chunk[0]``.
+
+    Worker processes import this module, which loads the chord table once.
+    """
+    start_id, progressions = chunk
+    return b''.join(_lua_index_rows(progressions, start_id))
+
+@functools.lru_cache(maxsize=1)
+def _worker_arrays(pickle_path: str) -> Optional[ProgressionArrays]:
+    """Memory-map the numpy sidecar once per worker process."""
+    return _load_arrays(pickle_path)
+
+def _lua_index_range(task: Tuple[str, int, int]) -> bytes:
+    """Worker entry point: render rows ``start``..``stop`` read from the sidecar itself.
+
+    Only the ``(pickle_path, start, stop)`` triple crosses the process
+    boundary; the progressions are never pickled.
+    """
+    pickle_path, start, stop = task
+    dataset = _worker_arrays(pickle_path)
+    if dataset is None:
+        raise RuntimeError(f"numpy sidecar for {pickle_path} is missing or stale")
+    return b''.join(_lua_index_rows((dataset[i] for i in range(start, stop)), start))
+
+def export_lua_index(dataset: Sequence[tuple], output_path: str, limit: int = 1000,
+                     workers: Optional[int] = None, pickle_path: Optional[str] = None) -> None:
     """
     Export a Lua table of chord progressions for use in a ReaScript panel.
+
+    Rows are assembled as bytes from per-chord fragments (built once per
+    distinct chord) and written in batches of ``LUA_EXPORT_BATCH`` rows.
+    Large exports (``LUA_PARALLEL_MIN`` rows or more) are rendered by a
+    process pool of ``workers`` processes (default: CPU count); pass
+    ``workers=1`` to force a single process. With ``pickle_path`` and a
+    sidecar-backed dataset, workers memory-map the sidecar and receive
+    only row ranges.
     """
+    count = min(limit, len(dataset))
+    if workers is None:
+        workers = (os.cpu_count() or 1) if count >= LUA_PARALLEL_MIN else 1
     try:
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write('-- Generated chord progression index\n')
-            f.write('CHORD_INDEX = {\n')
-            for i, prog in enumerate(dataset[:limit]):
-                chords = convert_progression_to_chords(prog)
-                # Get detailed analysis for each chord
-                chord_details = []
-                for chord_tuple in prog:
-                    analysis = get_chord_analysis(chord_tuple)
-                    chord_details.append(analysis)
-                
-                # escape quotes
-                chord_list = ', '.join(f'"{c}"' for c in chords)
-                
-                # Build note details with proper escaping
-                note_details_parts = []
-                for cd in chord_details:
-                    notes_str = ', '.join(f'"{n}"' for n in cd["notes"])
-                    midi_str = ', '.join(str(m) for m in cd["midi_notes"])
-                    detail_str = f'{{ name = "{cd["chord_name"]}", notes = {{ {notes_str} }}, midi = {{ {midi_str} }} }}'
-                    note_details_parts.append(detail_str)
-                note_details = ', '.join(note_details_parts)
-                
-                f.write(f'  {{ id = {i}, chords = {{ {chord_list} }}, details = {{ {note_details} }} }},\n')
-            f.write('}\n')
-        print(f"✅ Exported Lua index with {min(limit, len(dataset))} entries to {output_path}")
+        with open(output_path, 'wb', buffering=1 << 20) as f:
+            f.write(b'-- Generated chord progression index\n')
+            f.write(b'CHORD_INDEX = {\n')
+            if workers > 1:
+                starts = range(0, count, LUA_PARALLEL_CHUNK)
+                if pickle_path is not None and isinstance(dataset, ProgressionArrays):
+                    render = _lua_index_range
+                    tasks = ((pickle_path, start, min(start + LUA_PARALLEL_CHUNK, count))
+                             for start in starts)  # type: Iterator[Any]
+                else:
+                    render = _lua_index_chunk
+                    progressions = itertools.islice(dataset, count)
+                    tasks = ((start, list(itertools.islice(progressions, LUA_PARALLEL_CHUNK)))
+                             for start in starts)
+                # Submit lazily and write in order, so only a few chunks are held at once
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    in_flight = deque()  # type: deque
+                    for task in tasks:
+                        if len(in_flight) >= 2 * workers:
+                            f.write(in_flight.popleft().result())
+                        in_flight.append(executor.submit(render, task))
+                    while in_flight:
+                        f.write(in_flight.popleft().result())
+            else:
+                rows = _lua_index_rows(itertools.islice(dataset, count))
+                for batch in iter(lambda: list(itertools.islice(rows, LUA_EXPORT_BATCH)), []):
+                    f.write(b''.join(batch))
+            f.write(b'}\n')
+        print(f"✅ Exported Lua index with {count} entries to {output_path}")
     except Exception as e:
         print(f"❌ Failed to export Lua index: {e}")
 
+def _cli_json(obj: Any) -> str:
+    """Serialize a CLI result as indented JSON, using orjson when installed."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY).decode()
+    return json.dumps(obj, indent=2)
+
 def main():
     """Main CLI interface for dataset operations."""
     parser = argparse.ArgumentParser(description='Enhanced Chord Dataset Browser')
@@ -317,6 +1116,10 @@ def main():
     parser.add_argument('--progression-id', type=int, help='Progression ID for analysis')
     parser.add_argument('--template-id', type=int, help='Template progression ID for generation')
     parser.add_argument('--output-path', type=str, help='File path to write Lua index to')
+    parser.add_argument('--limit', type=int, default=1000,
+                        help='Maximum number of progressions to export to the Lua index')
+    parser.add_argument('--workers', type=int,
+                        help='Worker processes for large Lua exports (default: CPU count)')
     
     args = parser.parse_args()
     
@@ -335,21 +1138,38 @@ def main():
         if parts:
             parts = sorted(parts, key=lambda x: int(x.split('.zip.')[-1]))
             combined_zip = os.path.join(zip_dir, 'combined_chords.zip')
-            print(f"🛠 Reconstructing ZIP from parts: {parts}")
-            with open(combined_zip, 'wb') as out:
-                for part in parts:
-                    with open(os.path.join(zip_dir, part), 'rb') as pf:
-                        out.write(pf.read())
-            # unzip archive
+            # Another invocation may be reconstructing the same archive
             try:
-                import zipfile
-                with zipfile.ZipFile(combined_zip, 'r') as z:
-                    z.extractall(zip_dir)
-                print(f"✅ Unzipped combined archive to {zip_dir}")
-            except Exception as uz:
-                print(f"❌ Failed to unzip archive: {uz}")
-            finally:
-                os.remove(combined_zip)
+                with _exclusive_lock(combined_zip + '.lock'):
+                    if not os.path.exists(dataset_path):
+                        print(f"🛠 Reconstructing ZIP from parts: {parts}")
+                        with open(combined_zip, 'wb') as out:
+                            for part in parts:
+                                with open(os.path.join(zip_dir, part), 'rb') as pf:
+                                    out.write(pf.read())
+                        # unzip archive
+                        try:
+                            import zipfile
+                            with zipfile.ZipFile(combined_zip, 'r') as z:
+                                z.extractall(zip_dir)
+                            print(f"✅ Unzipped combined archive to {zip_dir}")
+                        except Exception as uz:
+                            print(f"❌ Failed to unzip archive: {uz}")
+                        finally:
+                            os.remove(combined_zip)
+            except TimeoutError as e:
+                print(f"❌ {e}")
+                return
+    
+    # A single progression can be read from the sidecar without loading the dataset
+    if args.command == 'analyze' and args.progression_id is not None:
+        progression = load_progression(dataset_path, args.progression_id)
+        if progression is not None:
+            with ChordNameCache(dataset_path) as name_cache:
+                chord_names = name_cache.chord_names(args.progression_id, progression)
+            print(_cli_json(analyze_progression(progression, chord_names)))
+            return
+    
     dataset = load_chord_dataset(dataset_path)
     
     if not dataset:
@@ -357,35 +1177,41 @@ def main():
         return
     
     if args.command == 'browse':
-        result = browse_dataset(dataset, args.page, args.items, args.search, args.min_length)
-        print(json.dumps(result, indent=2))
+        chord_strings = load_chord_strings(dataset, dataset_path) if args.search else None
+        with ChordNameCache(dataset_path) as name_cache:
+            result = browse_dataset(dataset, args.page, args.items, args.search, args.min_length,
+                                    chord_strings=chord_strings, name_cache=name_cache)
+        print(_cli_json(result))
     
     elif args.command == 'stats':
-        total = len(dataset)
-        lengths = [len(prog) for prog in dataset]
-        avg_length = sum(lengths) / len(lengths)
+        # Reductions over the chord-count array (np.diff of the sidecar offsets)
+        lengths = progression_lengths(dataset)
+        avg_length = int(lengths.sum(dtype=np.int64)) / lengths.size
         
         stats = {
-            "total_progressions": total,
+            "total_progressions": int(lengths.size),
             "average_length": round(avg_length, 2),
-            "min_length": min(lengths),
-            "max_length": max(lengths),
+            "min_length": int(lengths.min()),
+            "max_length": int(lengths.max()),
             "dataset_loaded": True
         }
-        print(json.dumps(stats, indent=2))
+        print(_cli_json(stats))
     
     elif args.command == 'analyze' and args.progression_id is not None:
         if 0 <= args.progression_id < len(dataset):
             progression = dataset[args.progression_id]
-            analysis = analyze_progression(progression)
-            print(json.dumps(analysis, indent=2))
+            with ChordNameCache(dataset_path) as name_cache:
+                chord_names = name_cache.chord_names(args.progression_id, progression)
+            analysis = analyze_progression(progression, chord_names)
+            print(_cli_json(analysis))
         else:
             print(f"❌ Invalid progression ID: {args.progression_id}")
     
     elif args.command == 'generate':
         if args.template_id is not None and 0 <= args.template_id < len(dataset):
             template = dataset[args.template_id]
-            new_progression = generate_similar_progression(template, dataset)
+            by_len = load_length_index(dataset, dataset_path)
+            new_progression = generate_similar_progression(template, dataset, by_len)
         else:
             new_progression = random.choice(dataset)
         
@@ -394,11 +1220,11 @@ def main():
             "generated_progression": new_progression,
             "analysis": analysis
         }
-        print(json.dumps(result, indent=2))
+        print(_cli_json(result))
     
     elif args.command == 'export-lua-index':
         output = args.output_path or 'chord_dataset_index.lua'
-        export_lua_index(dataset, output)
+        export_lua_index(dataset, output, args.limit, args.workers, pickle_path=dataset_path)
 
 if __name__ == "__main__":
     main()
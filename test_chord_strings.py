@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""
+Check that the JIT chord-name path agrees with the plain Python naming
+"""
+import pickle
+import random
+
+import pytest
+
+import dataset_browser
+
+def test_jit_chord_strings_match_python_names(tmp_path):
+    """build_chord_strings on a ProgressionArrays dataset matches _chord_search_string."""
+    pytest.importorskip("numba")
+    if dataset_browser.MUSIC21_AVAILABLE:
+        pytest.skip("music21 names chords itself; the JIT path is disabled")
+
+    rng = random.Random(0)
+    progressions = []
+    for _ in range(2000):
+        # Up to 12 notes per chord covers rests, every two-note interval and dense chords
+        progressions.append(tuple(
+            tuple(rng.randint(20, 100) for _ in range(rng.randint(0, 12)))
+            for _ in range(rng.randint(1, 8))))
+    pickle_path = str(tmp_path / "chords.pickle")
+    with open(pickle_path, 'wb') as f:
+        pickle.dump(progressions, f)
+
+    dataset = dataset_browser.load_chord_dataset(pickle_path)
+    assert isinstance(dataset, dataset_browser.ProgressionArrays)
+    assert dataset_browser.chord_name_ids(dataset) is not None
+
+    expected = [dataset_browser._chord_search_string(prog) for prog in progressions]
+    assert dataset_browser.build_chord_strings(dataset) == expected